@@ -0,0 +1,177 @@
+"""Gemini batch-mode request queue for non-interactive workloads."""
+
+import asyncio
+import logging
+from typing import Any
+
+from google import genai  # type: ignore[import-untyped]
+
+logger = logging.getLogger(__name__)
+
+# Seconds between batch job status checks
+_POLL_INTERVAL = 10.0
+
+# Default seconds to wait for a submitted job before failing its requests
+_JOB_TIMEOUT = 24 * 60 * 60.0
+
+# States of a job that is still making progress; anything else unexpected fails
+_ACTIVE_STATES = {
+    genai.types.JobState.JOB_STATE_QUEUED,
+    genai.types.JobState.JOB_STATE_PENDING,
+    genai.types.JobState.JOB_STATE_RUNNING,
+    genai.types.JobState.JOB_STATE_PAUSED,
+    genai.types.JobState.JOB_STATE_UPDATING,
+    genai.types.JobState.JOB_STATE_CANCELLING,
+}
+
+_TERMINAL_STATES = {
+    genai.types.JobState.JOB_STATE_SUCCEEDED,
+    genai.types.JobState.JOB_STATE_PARTIALLY_SUCCEEDED,
+    genai.types.JobState.JOB_STATE_FAILED,
+    genai.types.JobState.JOB_STATE_CANCELLED,
+    genai.types.JobState.JOB_STATE_EXPIRED,
+}
+
+
+class BatchQueue:
+    """Collects generate_content requests and submits them as Gemini batch jobs.
+
+    Requests are flushed as one inline batch job once max_size requests are
+    queued or max_wait seconds have passed since the first queued request.
+    Requests are grouped per client, so each job runs under the API key of the
+    requests in it. Each caller awaits its own response, which is resolved when
+    the job ends or fails once job_timeout seconds pass.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        max_size: int = 16,
+        max_wait: float = 5.0,
+        job_timeout: float = _JOB_TIMEOUT,
+    ):
+        """Initialize the queue.
+
+        Args:
+            model: Model used for every batch job
+            max_size: Number of queued requests that triggers an immediate flush
+            max_wait: Seconds to wait for more requests before flushing
+            job_timeout: Seconds to wait for a submitted job to finish
+        """
+        self.model = model
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self.job_timeout = job_timeout
+        self._pending: dict[
+            genai.Client,
+            list[
+                tuple[
+                    genai.types.InlinedRequest,
+                    asyncio.Future[genai.types.GenerateContentResponse],
+                ]
+            ],
+        ] = {}
+        self._timer: asyncio.TimerHandle | None = None
+        self._jobs: set[asyncio.Task[None]] = set()
+
+    async def submit(
+        self,
+        client: genai.Client,
+        contents: list[Any],
+        config: genai.types.GenerateContentConfig | None = None,
+    ) -> genai.types.GenerateContentResponse:
+        """Queue a request and wait for its response from the batch job.
+
+        Args:
+            client: Gemini client used to create and poll the batch job
+            contents: Request contents
+            config: Optional generation config
+
+        Returns:
+            Model response for this request
+        """
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[genai.types.GenerateContentResponse] = loop.create_future()
+        pending = self._pending.setdefault(client, [])
+        pending.append((genai.types.InlinedRequest(contents=contents, config=config), future))
+
+        if len(pending) >= self.max_size:
+            self._flush(client)
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush_all)
+
+        return await future
+
+    def _flush_all(self) -> None:
+        """Submit every client's queued requests (timer callback)."""
+        self._timer = None
+        for client in list(self._pending):
+            self._flush(client)
+
+    def _flush(self, client: genai.Client) -> None:
+        """Submit a client's queued requests as one batch job in the background.
+
+        Args:
+            client: Client whose queued requests to submit
+        """
+        items = self._pending.pop(client, [])
+        if not self._pending and self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not items:
+            return
+
+        task = asyncio.get_running_loop().create_task(self._run(client, items))
+        self._jobs.add(task)
+        task.add_done_callback(self._jobs.discard)
+
+    async def _run(
+        self,
+        client: genai.Client,
+        items: list[
+            tuple[genai.types.InlinedRequest, asyncio.Future[genai.types.GenerateContentResponse]]
+        ],
+    ) -> None:
+        """Create a batch job, wait for it, and resolve each request's future.
+
+        Args:
+            client: Gemini client
+            items: Queued requests with the futures awaiting them
+        """
+        futures = [future for _, future in items]
+        try:
+            job = await client.aio.batches.create(
+                model=self.model, src=[request for request, _ in items]
+            )
+            logger.info(f"Submitted batch job {job.name} with {len(items)} request(s)")
+            deadline = asyncio.get_running_loop().time() + self.job_timeout
+            while job.state not in _TERMINAL_STATES:
+                if job.state not in _ACTIVE_STATES:
+                    raise RuntimeError(f"Batch job {job.name} is in unexpected state {job.state}")
+                if asyncio.get_running_loop().time() >= deadline:
+                    raise RuntimeError(
+                        f"Batch job {job.name} did not finish within {self.job_timeout:g}s"
+                    )
+                await asyncio.sleep(_POLL_INTERVAL)
+                job = await client.aio.batches.get(name=job.name or "")
+
+            responses = (job.dest.inlined_responses if job.dest else None) or []
+            for index, future in enumerate(futures):
+                if future.done():
+                    continue
+                inlined = responses[index] if index < len(responses) else None
+                if inlined is not None and inlined.response is not None:
+                    future.set_result(inlined.response)
+                else:
+                    error = inlined.error if inlined is not None else job.error
+                    message = error.message if error is not None else job.state
+                    future.set_exception(RuntimeError(f"Batch request failed: {message}"))
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            # Cancellation (or a response mismatch) must not leave callers waiting forever
+            for future in futures:
+                if not future.done():
+                    future.cancel()
@@ -1,16 +1,396 @@
 """Nano Banana Pro Amplifier Tool implementation."""
 
+import asyncio
+import functools
+import hashlib
 import logging
 import mimetypes
 import os
+import random
+import threading
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterator
+from datetime import UTC, datetime
 from pathlib import Path
-from typing import Any
+from stat import S_ISREG
+from typing import Any, Final, NamedTuple, cast
 
 from amplifier_core import ModuleCoordinator, ToolResult
+from google import genai  # type: ignore[import-untyped]
+
+from .batch import BatchQueue
 
 logger = logging.getLogger(__name__)
 
 
+def _env_int(name: str, default: int, minimum: int | None = None) -> int:
+    """Read an integer environment variable, falling back to default if unset or invalid.
+
+    Values that are malformed or below minimum (when given) are logged and ignored.
+    """
+    value = os.getenv(name)
+    if value is None:
+        return default
+    try:
+        parsed = int(value)
+    except ValueError:
+        parsed = None
+    if parsed is None or (minimum is not None and parsed < minimum):
+        logger.warning(f"Ignoring invalid {name}={value!r}; using {default}")
+        return default
+    return parsed
+
+
+# Common image types, checked before falling back to the mimetypes database
+_IMAGE_MIME = {
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".webp": "image/webp",
+    ".gif": "image/gif",
+}
+
+# Leading signature bytes -> MIME type, trusted over the file extension
+_MAGIC_MIME = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+
+# Images larger than this are uploaded via the Files API instead of sent inline
+_INLINE_MAX_BYTES = 5 * 1024 * 1024
+
+# Input images larger than this are rejected before they are read or uploaded
+_MAX_IMAGE_BYTES = _env_int("NANOBANANA_MAX_IMAGE_MB", 32) * 1024 * 1024
+
+# Byte budget for the shared inline image cache
+_IMAGE_CACHE_MAX_BYTES = _env_int("NANOBANANA_IMAGE_CACHE_MB", 128) * 1024 * 1024
+
+# Maximum number of uploaded file references kept for reuse
+_FILE_CACHE_SIZE = 32
+
+# Maximum number of uploaded image content hashes kept for reuse
+_HASH_CACHE_SIZE = 256
+
+# Default cap on concurrent Gemini requests per tool instance
+_MAX_CONCURRENCY = _env_int("NANOBANANA_MAX_INFLIGHT", 10, minimum=1)
+
+# Default seconds a request may wait for a concurrency slot before failing
+_QUEUE_TIMEOUT = 60.0
+
+# Default retries for a model call that fails with a transient status
+_MAX_RETRIES = 3
+
+# Backoff before retry n is min(base * 2**n, max), jittered by 0.5x-1.5x
+_RETRY_BASE_DELAY = 1.0
+_RETRY_MAX_DELAY = 30.0
+
+# Rate-limit and server-side statuses worth retrying
+_RETRYABLE_CODES = frozenset({429, 500, 502, 503, 504})
+
+# compare labels and their prebuilt content markers for the default case
+_DEFAULT_LABEL_1, _DEFAULT_LABEL_2 = "IMAGE 1", "IMAGE 2"
+_DEFAULT_MARK_1, _DEFAULT_MARK_2 = f"^ {_DEFAULT_LABEL_1}", f"^ {_DEFAULT_LABEL_2}"
+
+# compare answer for byte-identical images when skip_identical is on
+_IDENTICAL_COMPARISON = "Images are byte-identical (100% match)."
+
+# Maximum number of images in one analyze_batch request
+_MAX_BATCH_IMAGES = 16
+
+# Default number of analyze/compare responses kept for reuse (0 disables)
+_RESPONSE_CACHE_SIZE = _env_int("NANOBANANA_RESPONSE_CACHE_SIZE", 128)
+
+
+@functools.lru_cache(maxsize=64)
+def _mime_for_suffix(suffix: str) -> str:
+    """Map a lowercase file suffix to a MIME type (defaults to image/png if unknown)."""
+    mime_type, _ = mimetypes.guess_type(f"x{suffix}")
+    return mime_type or "image/png"
+
+
+def _sniff_mime(head: bytes) -> str | None:
+    """Detect an image MIME type from its leading bytes (None if unrecognized)."""
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    for magic, mime_type in _MAGIC_MIME:
+        if head.startswith(magic):
+            return mime_type
+    return None
+
+
+def _sniff_file(path: Path) -> str | None:
+    """Detect an image file's MIME type from its header. Blocking."""
+    with open(path, "rb") as f:
+        return _sniff_mime(f.read(12))
+
+
+def _mime_for_path(file_path: str | Path) -> str:
+    """Map a file path to a MIME type by extension (defaults to image/png if unknown)."""
+    suffix = os.path.splitext(file_path)[1].lower()
+    return _IMAGE_MIME.get(suffix) or _mime_for_suffix(suffix)
+
+
+# Parameters each operation needs, checked before any client is created
+_REQUIRED: dict[str, tuple[str, ...]] = {
+    "analyze": ("image_path",),
+    "analyze_batch": ("image_paths",),
+    "compare": ("image1_path", "image2_path"),
+    "generate": ("output_path",),
+}
+
+
+def _validate_input(operation: str, input_data: dict[str, Any]) -> str | None:
+    """Check an operation's parameters without touching the filesystem or network.
+
+    Returns:
+        Error message, or None if the input is valid
+    """
+    required = _REQUIRED[operation]
+    if not all(input_data.get(param) for param in required):
+        return f"{' and '.join(required)} required for {operation} operation"
+
+    if operation == "analyze_batch":
+        value = input_data["image_paths"]
+        image_paths = cast(list[Any], value) if isinstance(value, list) else None
+        if image_paths is None or not all(isinstance(p, str) for p in image_paths):
+            return "image_paths must be a list of path strings"
+        if len(image_paths) > _MAX_BATCH_IMAGES:
+            return (
+                f"analyze_batch accepts at most {_MAX_BATCH_IMAGES} images, got {len(image_paths)}"
+            )
+    else:
+        for param in required:
+            if not isinstance(input_data[param], str):
+                return f"{param} must be a path string"
+
+    if operation == "generate":
+        number_of_images = input_data.get("number_of_images", 1)
+        # bool is an int subclass but never a meaningful count
+        if (
+            not isinstance(number_of_images, int)
+            or isinstance(number_of_images, bool)
+            or not 1 <= number_of_images <= 4
+        ):
+            return "number_of_images must be between 1 and 4"
+    return None
+
+
+# Built once; tool runtimes read the schema on every tool listing
+_INPUT_SCHEMA: Final[dict[str, Any]] = {
+    "type": "object",
+    "properties": {
+        "operation": {
+            "type": "string",
+            "enum": ["analyze", "analyze_batch", "compare", "generate"],
+            "description": (
+                "Operation: analyze (single image), analyze_batch (several images, "
+                "one prompt), compare (two images), or generate (create image)"
+            ),
+        },
+        "prompt": {
+            "type": "string",
+            "description": "Analysis, comparison, or generation prompt/question",
+        },
+        "image_path": {
+            "type": "string",
+            "description": "Image path (required for analyze operation)",
+        },
+        "image_paths": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": (
+                "Image paths (required for analyze_batch operation, "
+                f"max {_MAX_BATCH_IMAGES}). All images are sent in one request."
+            ),
+            "minItems": 1,
+            "maxItems": _MAX_BATCH_IMAGES,
+        },
+        "image1_path": {
+            "type": "string",
+            "description": "First image path (required for compare - usually original mockup)",
+        },
+        "image2_path": {
+            "type": "string",
+            "description": (
+                "Second image path (required for compare - usually implementation screenshot)"
+            ),
+        },
+        "image1_label": {
+            "type": "string",
+            "description": "Label for first image (default: 'IMAGE 1')",
+            "default": _DEFAULT_LABEL_1,
+        },
+        "image2_label": {
+            "type": "string",
+            "description": "Label for second image (default: 'IMAGE 2')",
+            "default": _DEFAULT_LABEL_2,
+        },
+        "skip_identical": {
+            "type": "boolean",
+            "description": (
+                "For compare: answer byte-identical images with a 100% match "
+                "without calling the model (default: true)"
+            ),
+            "default": True,
+        },
+        "output_path": {
+            "type": "string",
+            "description": (
+                "Output path for generated image (required for generate operation). "
+                "Supports .png and .jpg/.jpeg extensions."
+            ),
+        },
+        "number_of_images": {
+            "type": "integer",
+            "description": "Number of images to generate (default: 1, max: 4)",
+            "default": 1,
+            "minimum": 1,
+            "maximum": 4,
+        },
+        "reference_image_path": {
+            "type": "string",
+            "description": (
+                "Optional reference image for generate operation. "
+                "Use to guide style, composition, or content of generated image."
+            ),
+        },
+    },
+    "required": ["operation", "prompt"],
+}
+
+
+def _err(msg: str) -> ToolResult:
+    """Build a failed ToolResult carrying msg as both output and error message."""
+    return ToolResult(success=False, output=msg, error={"message": msg})
+
+
+def _lru_put(cache: OrderedDict[Any, Any], key: Any, value: Any, maxsize: int) -> None:
+    """Insert into an OrderedDict LRU, evicting the least recently used entry on overflow."""
+    cache[key] = value
+    cache.move_to_end(key)
+    if len(cache) > maxsize:
+        cache.popitem(last=False)
+
+
+def _prompt_key(prompt: str) -> str:
+    """Hash a prompt, normalized for case and whitespace, for response cache keys.
+
+    Hashing keeps long prompts from being held in the cache keys themselves.
+    """
+    normalized = " ".join(prompt.split()).lower()
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+
+class _CachedImage(NamedTuple):
+    """Inline image bytes with their content hash and ready-to-send Part.
+
+    The Part wraps the same bytes object (no copy), so requests reuse it as is.
+    The SDK base64-encodes inline bytes while serializing each request; a
+    pre-encoded string would only be decoded back to bytes by its validator.
+    """
+
+    data: bytes
+    digest: str
+    part: genai.types.Part
+
+
+# (API key, event loop) -> Gemini client, shared so tool instances reuse one
+# transport. The async transport is bound to the loop it first ran on, so each
+# loop gets its own client and entries for closed loops are dropped.
+_CLIENT_CACHE: dict[tuple[str, asyncio.AbstractEventLoop | None], genai.Client] = {}
+
+# (path, mtime_ns, size) -> image, most recently used last. Shared by every tool
+# instance and filled from worker threads, hence the lock.
+_image_cache: OrderedDict[tuple[str, int, int], _CachedImage] = OrderedDict()
+_image_cache_bytes = 0
+_image_cache_lock = threading.Lock()
+
+
+def _load_image(path: Path) -> _CachedImage:
+    """Load an inline image, reusing cached bytes while the file is unchanged.
+
+    Entries are evicted least recently used first once the cache exceeds
+    _IMAGE_CACHE_MAX_BYTES. Blocking; call from a worker thread.
+    """
+    global _image_cache_bytes
+
+    # Stat the open descriptor so the cache key describes the bytes actually read
+    with open(path, "rb") as f:
+        stat = os.fstat(f.fileno())
+        key = (str(path), stat.st_mtime_ns, stat.st_size)
+        with _image_cache_lock:
+            cached = _image_cache.get(key)
+            if cached is not None:
+                _image_cache.move_to_end(key)
+                return cached
+        data = f.read()
+
+    mime_type = _sniff_mime(data[:12]) or _mime_for_path(path)
+    image = _CachedImage(
+        data,
+        hashlib.blake2b(data, digest_size=16).hexdigest(),
+        genai.types.Part.from_bytes(data=data, mime_type=mime_type),
+    )
+    if len(data) > _IMAGE_CACHE_MAX_BYTES:
+        return image
+
+    with _image_cache_lock:
+        previous = _image_cache.pop(key, None)
+        if previous is not None:
+            _image_cache_bytes -= len(previous.data)
+        _image_cache[key] = image
+        _image_cache_bytes += len(data)
+        while _image_cache_bytes > _IMAGE_CACHE_MAX_BYTES:
+            _, evicted = _image_cache.popitem(last=False)
+            _image_cache_bytes -= len(evicted.data)
+    return image
+
+
+def _hash_file(path: Path) -> str:
+    """Return the BLAKE2b content hash of a file."""
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, lambda: hashlib.blake2b(digest_size=16)).hexdigest()
+
+
+# Response modalities for image generation (text is kept for the model's notes)
+_GENERATE_MODALITIES = ["TEXT", "IMAGE"]
+
+# Config for single-image fallback requests
+_SINGLE_IMAGE_CONFIG = genai.types.GenerateContentConfig(response_modalities=_GENERATE_MODALITIES)
+
+
+def _is_candidate_count_unsupported(error: genai.errors.ClientError) -> bool:
+    """Return True if the model rejected the request for asking for multiple candidates."""
+    return error.code == 400 and "candidate" in (error.message or "").lower()
+
+
+def _retry_delay(attempt: int) -> float:
+    """Return the jittered backoff in seconds before retry number attempt (from 0)."""
+    return min(_RETRY_BASE_DELAY * 2**attempt, _RETRY_MAX_DELAY) * (0.5 + random.random())
+
+
+def _response_parts(
+    responses: list[genai.types.GenerateContentResponse],
+) -> Iterator[genai.types.Part]:
+    """Yield content parts from every candidate of every response."""
+    for response in responses:
+        for candidate in response.candidates or []:
+            if candidate.content is not None:
+                yield from candidate.content.parts or []
+
+
+def _finish_reason(responses: list[genai.types.GenerateContentResponse]) -> str | None:
+    """Return the first non-STOP finish reason across responses, if any."""
+    for response in responses:
+        for candidate in response.candidates or []:
+            reason = candidate.finish_reason
+            if reason is not None and reason != genai.types.FinishReason.STOP:
+                return reason.value
+    return None
+
+
 class NanoBananaTool:
     """
     Nano Banana Pro VLM tool for Amplifier.
@@ -23,6 +403,16 @@ class NanoBananaTool:
     - generate: Create images from text prompt, optionally guided by a reference image
     """
 
+    name = "nano-banana"
+    description = (
+        "Nano Banana Pro VLM for visual analysis, comparison, and generation. "
+        "Operations: analyze (single image) | analyze_batch (several images, one request) | "
+        "compare (two images) | "
+        "generate (create images from text, optionally with reference image). "
+        "Use for mockup analysis, screenshot comparison, component identification, "
+        "typography analysis, iterative refinement, and image generation."
+    )
+
     def __init__(self, config: dict[str, Any], coordinator: ModuleCoordinator):
         """Initialize tool with configuration and coordinator.
 
@@ -30,96 +420,78 @@ class NanoBananaTool:
             config: Tool configuration
                 - api_key: Google API key (optional, uses GOOGLE_API_KEY env var if not set)
                 - working_dir: Working directory for resolving relative paths
+                - max_concurrency: Maximum concurrent Gemini requests
+                  (default: NANOBANANA_MAX_INFLIGHT env var or 10)
+                - queue_timeout: Seconds to wait for a free request slot before
+                  failing as overloaded (default: 60, None waits indefinitely)
+                - max_retries: Retries for rate-limited or server-error model calls
+                  (default: 3, 0 disables)
+                - response_cache_size: Number of analyze/compare responses to cache
+                  (default: NANOBANANA_RESPONSE_CACHE_SIZE env var or 128, 0 disables)
+                - batch_mode: Route model calls through Gemini batch jobs for
+                  non-interactive workloads (default: False)
+                - batch_size: Requests per batch job (default: 16)
+                - batch_max_wait: Seconds to wait for a batch to fill (default: 5)
+                - batch_timeout: Seconds to wait for a submitted batch job before
+                  failing its requests (default: 86400)
             coordinator: Module coordinator for event emission and capabilities
         """
         self.config = config
         self.coordinator = coordinator
-        self.api_key = config.get("api_key") or os.getenv("GOOGLE_API_KEY")
+        self._config_api_key: str | None = config.get("api_key")
+        # Client cache key this tool last used, for evicting it on key rotation
+        self._client_key: tuple[str, asyncio.AbstractEventLoop | None] | None = None
         self.working_dir = config.get("working_dir")
+        self._working_dir_path = Path(self.working_dir) if self.working_dir else None
         self.model = "gemini-3-pro-image-preview"
+        # (path, mtime_ns, size) -> uploaded File, most recently used last
+        self._file_cache: OrderedDict[tuple[str, int, int], genai.types.File] = OrderedDict()
+        # (path, mtime_ns, size) -> content hash of images too large to inline
+        self._hash_cache: OrderedDict[tuple[str, int, int], str] = OrderedDict()
+        # (operation, image hashes..., labels..., normalized prompt) -> response text
+        self._response_cache: OrderedDict[tuple[str, ...], str] = OrderedDict()
+        self._response_cache_size: int = config.get("response_cache_size", _RESPONSE_CACHE_SIZE)
+        max_concurrency = config.get("max_concurrency", _MAX_CONCURRENCY)
+        if not isinstance(max_concurrency, int) or max_concurrency < 1:
+            logger.warning(
+                f"Ignoring invalid max_concurrency={max_concurrency!r}; using {_MAX_CONCURRENCY}"
+            )
+            max_concurrency = _MAX_CONCURRENCY
+        self._max_concurrency: int = max_concurrency
+        self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        self._queue_timeout: float | None = config.get("queue_timeout", _QUEUE_TIMEOUT)
+        self._max_retries: int = config.get("max_retries", _MAX_RETRIES)
+        self._batch_queue = (
+            BatchQueue(
+                self.model,
+                max_size=config.get("batch_size", 16),
+                max_wait=config.get("batch_max_wait", 5.0),
+                job_timeout=config.get("batch_timeout", 24 * 60 * 60.0),
+            )
+            if config.get("batch_mode")
+            else None
+        )
+        self._dispatch: dict[
+            str, Callable[[dict[str, Any], str, genai.Client], Awaitable[ToolResult]]
+        ] = {
+            "analyze": self._analyze,
+            "analyze_batch": self._analyze_batch,
+            "compare": self._compare,
+            "generate": self._generate,
+        }
 
     @property
-    def name(self) -> str:
-        return "nano-banana"
+    def api_key(self) -> str | None:
+        """Configured API key, else GOOGLE_API_KEY as currently set.
 
-    @property
-    def description(self) -> str:
-        return (
-            "Nano Banana Pro VLM for visual analysis, comparison, and generation. "
-            "Operations: analyze (single image) | compare (two images) | "
-            "generate (create images from text, optionally with reference image). "
-            "Use for mockup analysis, screenshot comparison, component identification, "
-            "typography analysis, iterative refinement, and image generation."
-        )
+        The environment is read per call, so a rotated key takes effect (with a
+        fresh client) without restarting the session.
+        """
+        return self._config_api_key or os.getenv("GOOGLE_API_KEY")
 
     @property
     def input_schema(self) -> dict[str, Any]:
-        return {
-            "type": "object",
-            "properties": {
-                "operation": {
-                    "type": "string",
-                    "enum": ["analyze", "compare", "generate"],
-                    "description": (
-                        "Operation: analyze (single image), compare (two images), "
-                        "or generate (create image)"
-                    ),
-                },
-                "prompt": {
-                    "type": "string",
-                    "description": "Analysis, comparison, or generation prompt/question",
-                },
-                "image_path": {
-                    "type": "string",
-                    "description": "Image path (required for analyze operation)",
-                },
-                "image1_path": {
-                    "type": "string",
-                    "description": (
-                        "First image path (required for compare - usually original mockup)"
-                    ),
-                },
-                "image2_path": {
-                    "type": "string",
-                    "description": (
-                        "Second image path (required for compare - "
-                        "usually implementation screenshot)"
-                    ),
-                },
-                "image1_label": {
-                    "type": "string",
-                    "description": "Label for first image (default: 'IMAGE 1')",
-                    "default": "IMAGE 1",
-                },
-                "image2_label": {
-                    "type": "string",
-                    "description": "Label for second image (default: 'IMAGE 2')",
-                    "default": "IMAGE 2",
-                },
-                "output_path": {
-                    "type": "string",
-                    "description": (
-                        "Output path for generated image (required for generate operation). "
-                        "Supports .png and .jpg/.jpeg extensions."
-                    ),
-                },
-                "number_of_images": {
-                    "type": "integer",
-                    "description": "Number of images to generate (default: 1, max: 4)",
-                    "default": 1,
-                    "minimum": 1,
-                    "maximum": 4,
-                },
-                "reference_image_path": {
-                    "type": "string",
-                    "description": (
-                        "Optional reference image for generate operation. "
-                        "Use to guide style, composition, or content of generated image."
-                    ),
-                },
-            },
-            "required": ["operation", "prompt"],
-        }
+        return _INPUT_SCHEMA
 
     def _resolve_path(self, path_str: str) -> Path:
         """Resolve file path (absolute or relative to working_dir).
@@ -131,252 +503,616 @@ class NanoBananaTool:
             Resolved Path object
         """
         path = Path(path_str).expanduser()
-        if not path.is_absolute() and self.working_dir:
-            path = Path(self.working_dir) / path
-        return path
+        if path.is_absolute() or self._working_dir_path is None:
+            return path
+        return self._working_dir_path / path
+
+    async def _resolve_image(self, path_str: str) -> Path | ToolResult:
+        """Resolve an input image path, checking that it is an existing file.
+
+        Args:
+            path_str: File path string
+
+        Returns:
+            Absolute, symlink-free Path object, or an error ToolResult if the path
+            does not exist, is not a regular file, or exceeds _MAX_IMAGE_BYTES
+        """
+        path = self._resolve_path(path_str)
 
-    def _get_mime_type(self, file_path: Path) -> str:
+        def resolve() -> tuple[Path, os.stat_result]:
+            resolved = path.resolve(strict=True)
+            return resolved, resolved.stat()
+
+        try:
+            resolved, stat = await asyncio.to_thread(resolve)
+        except FileNotFoundError:
+            return _err(f"Image file not found: {path_str}")
+        if not S_ISREG(stat.st_mode):
+            return _err(f"Image path is not a file: {path_str}")
+        if stat.st_size > _MAX_IMAGE_BYTES:
+            return _err(
+                f"Image too large: {path_str} is {stat.st_size} bytes "
+                f"(limit {_MAX_IMAGE_BYTES}; set NANOBANANA_MAX_IMAGE_MB to raise it)"
+            )
+        return resolved
+
+    def _get_mime_type(self, file_path: str | Path) -> str:
         """Detect MIME type from file extension.
 
         Args:
-            file_path: Path to file
+            file_path: Path to file, as a string or Path
 
         Returns:
             MIME type string (defaults to image/png if unknown)
         """
-        mime_type, _ = mimetypes.guess_type(str(file_path))
-        # Default to PNG if unknown
-        return mime_type or "image/png"
+        return _mime_for_path(file_path)
 
-    async def execute(self, input_data: dict[str, Any]) -> ToolResult:
-        """Execute VLM operation.
+    def _get_client(self) -> genai.Client:
+        """Return the Gemini client for the running event loop, creating it on first use.
+
+        The client owns the underlying HTTP transport, so reusing it across
+        calls (and tool instances with the same API key) avoids re-establishing
+        connections for every request. Lookup and creation never await, so a
+        burst of concurrent calls on one loop still builds a single client.
+
+        Returns:
+            Cached genai.Client instance
+        """
+        try:
+            loop: asyncio.AbstractEventLoop | None = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        for key in [key for key in _CLIENT_CACHE if key[1] is not None and key[1].is_closed()]:
+            del _CLIENT_CACHE[key]
+
+        api_key = self.api_key
+        key = (api_key or "", loop)
+        client = _CLIENT_CACHE.get(key)
+        if client is None:
+            # When this tool's key rotates, drop the loop's client for the old
+            # key so a long-lived loop does not accumulate clients
+            if self._client_key is not None and self._client_key[1] is loop:
+                _CLIENT_CACHE.pop(self._client_key, None)
+            client = _CLIENT_CACHE[key] = genai.Client(api_key=api_key)
+        self._client_key = key
+        return client
+
+    async def _generate_content(
+        self,
+        client: genai.Client,
+        contents: list[Any],
+        config: genai.types.GenerateContentConfig | None = None,
+    ) -> genai.types.GenerateContentResponse:
+        """Call the model, bounded by the instance's concurrency limit.
+
+        Rate-limit and server errors are retried up to max_retries times with
+        jittered exponential backoff. Each attempt takes its own request slot,
+        so backing off does not hold one. In batch mode the request is queued
+        into a Gemini batch job instead.
+
+        Args:
+            client: Gemini client
+            contents: Request contents
+            config: Optional generation config
+
+        Returns:
+            Model response
+
+        Raises:
+            RuntimeError: If no request slot frees up within queue_timeout
+            genai.errors.APIError: If the model call fails (after any retries)
+        """
+        if self._batch_queue is not None:
+            return await self._batch_queue.submit(client, contents, config)
+
+        attempt = 0
+        while True:
+            try:
+                async with asyncio.timeout(self._queue_timeout):
+                    await self._semaphore.acquire()
+            except TimeoutError:
+                raise RuntimeError(
+                    f"Too many concurrent requests (limit {self._max_concurrency}); try again later"
+                ) from None
+
+            try:
+                return await client.aio.models.generate_content(
+                    model=self.model, contents=contents, config=config
+                )
+            except genai.errors.APIError as e:
+                if e.code not in _RETRYABLE_CODES or attempt >= self._max_retries:
+                    raise
+                delay = _retry_delay(attempt)
+                logger.warning(f"Model call failed with {e.code}; retrying in {delay:.1f}s")
+            finally:
+                self._semaphore.release()
+
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _emit_usage(
+        self, operation: str, response: genai.types.GenerateContentResponse
+    ) -> None:
+        """Emit token usage for a single model call.
+
+        Args:
+            operation: Operation that issued the call
+            response: Model response carrying usage metadata
+        """
+        usage = response.usage_metadata
+        if usage is None:
+            return
+        await self.coordinator.hooks.emit(
+            "tool.vlm.usage",
+            {
+                "operation": operation,
+                "model": self.model,
+                "prompt_tokens": usage.prompt_token_count,
+                "candidates_tokens": usage.candidates_token_count,
+                "total_tokens": usage.total_token_count,
+            },
+        )
+
+    async def _upload_file(
+        self, client: genai.Client, image_path: Path, stat: os.stat_result, mime_type: str
+    ) -> genai.types.File:
+        """Upload an image via the Files API, reusing a previous upload if unchanged.
+
+        Args:
+            client: Gemini client
+            image_path: Resolved image path
+            stat: Stat result for image_path
+            mime_type: MIME type of the image
+
+        Returns:
+            Uploaded File reference
+        """
+        key = (str(image_path), stat.st_mtime_ns, stat.st_size)
+        cached = self._file_cache.get(key)
+        if cached is not None and (
+            cached.expiration_time is None or cached.expiration_time > datetime.now(UTC)
+        ):
+            self._file_cache.move_to_end(key)
+            return cached
+
+        file_ref = await client.aio.files.upload(file=image_path, config={"mime_type": mime_type})
+        _lru_put(self._file_cache, key, file_ref, _FILE_CACHE_SIZE)
+        return file_ref
+
+    async def _image_hash(self, image_path: Path) -> str:
+        """Return the content hash of an image, reusing it while the file is unchanged.
+
+        Args:
+            image_path: Resolved image path
+
+        Returns:
+            Hex digest of the image bytes
+        """
+        stat = await asyncio.to_thread(image_path.stat)
+        if stat.st_size <= _INLINE_MAX_BYTES:
+            # Inline images are hashed as they are loaded into the image cache
+            return (await asyncio.to_thread(_load_image, image_path)).digest
+
+        key = (str(image_path), stat.st_mtime_ns, stat.st_size)
+        cached = self._hash_cache.get(key)
+        if cached is not None:
+            self._hash_cache.move_to_end(key)
+            return cached
+
+        digest = await asyncio.to_thread(_hash_file, image_path)
+        _lru_put(self._hash_cache, key, digest, _HASH_CACHE_SIZE)
+        return digest
+
+    def _cached_response(self, key: tuple[str, ...]) -> str | None:
+        """Look up a cached analyze/compare response.
+
+        Args:
+            key: Response cache key
+
+        Returns:
+            Cached response text, or None on a miss
+        """
+        cached = self._response_cache.get(key)
+        if cached is not None:
+            self._response_cache.move_to_end(key)
+        return cached
+
+    def _store_response(self, key: tuple[str, ...], text: str | None) -> None:
+        """Cache an analyze/compare response (no-op when caching is disabled).
+
+        Args:
+            key: Response cache key
+            text: Response text from the model
+        """
+        if text is not None and self._response_cache_size > 0:
+            _lru_put(self._response_cache, key, text, self._response_cache_size)
+
+    async def _image_part(
+        self, client: genai.Client, image_path: Path
+    ) -> genai.types.Part | genai.types.File:
+        """Build a content part for an image file.
+
+        Small images are sent inline; large ones are uploaded through the Files
+        API so the SDK streams them from disk instead of holding them in memory.
+        The MIME type comes from the file's signature bytes, falling back to its
+        extension, so a mislabeled JPEG is not sent as PNG.
+
+        Args:
+            client: Gemini client
+            image_path: Resolved image path
+
+        Returns:
+            Inline Part or uploaded File reference
+        """
+        stat = await asyncio.to_thread(image_path.stat)
+        if stat.st_size > _INLINE_MAX_BYTES:
+            mime_type = await asyncio.to_thread(_sniff_file, image_path)
+            return await self._upload_file(
+                client, image_path, stat, mime_type or self._get_mime_type(image_path)
+            )
+        return (await asyncio.to_thread(_load_image, image_path)).part
+
+    async def _analyze(
+        self, input_data: dict[str, Any], prompt: str, client: genai.Client
+    ) -> ToolResult:
+        """Analyze a single image.
 
         Args:
             input_data: Input parameters matching input_schema
+            prompt: Operation prompt
+            client: Gemini client
 
         Returns:
             ToolResult with success status and output/error
         """
-        from google import genai  # type: ignore[import-untyped]
+        # Resolve path before announcing the analysis
+        image_path = await self._resolve_image(input_data["image_path"])
+        if isinstance(image_path, ToolResult):
+            return image_path
+
+        # Emit event before analysis
+        await self.coordinator.hooks.emit(
+            "tool.vlm.analyze",
+            {
+                "image_path": str(image_path),
+                "model": self.model,
+                "prompt_length": len(prompt),
+            },
+        )
 
-        # Check API key
-        if not self.api_key:
-            error_msg = (
-                "GOOGLE_API_KEY environment variable not set. "
-                "Get your API key from: https://aistudio.google.com/apikey"
+        # Reuse a previous answer to the same question about the same image
+        cache_key: tuple[str, ...] = ()
+        if self._response_cache_size > 0:
+            cache_key = ("analyze", await self._image_hash(image_path), _prompt_key(prompt))
+            cached = self._cached_response(cache_key)
+            if cached is not None:
+                logger.info(f"VLM analysis served from cache for {image_path}")
+                return ToolResult(success=True, output={"analysis": cached})
+
+        image_part = await self._image_part(client, image_path)
+
+        # VLM analysis
+        response = await self._generate_content(client, [prompt, image_part])
+        self._store_response(cache_key, response.text)
+
+        logger.info(f"VLM analysis completed for {image_path}")
+        return ToolResult(success=True, output={"analysis": response.text})
+
+    async def _analyze_batch(
+        self, input_data: dict[str, Any], prompt: str, client: genai.Client
+    ) -> ToolResult:
+        """Analyze several images with one prompt in a single model request.
+
+        Args:
+            input_data: Input parameters matching input_schema
+            prompt: Operation prompt
+            client: Gemini client
+
+        Returns:
+            ToolResult with success status and output/error
+        """
+        image_path_strs: list[str] = input_data["image_paths"]
+
+        # Resolve paths before announcing the analysis
+        resolved = await asyncio.gather(*[self._resolve_image(p) for p in image_path_strs])
+        image_paths: list[Path] = []
+        for image_path in resolved:
+            if isinstance(image_path, ToolResult):
+                return image_path
+            image_paths.append(image_path)
+
+        # Emit event before analysis
+        await self.coordinator.hooks.emit(
+            "tool.vlm.analyze_batch",
+            {
+                "image_paths": [str(p) for p in image_paths],
+                "model": self.model,
+                "prompt_length": len(prompt),
+            },
+        )
+
+        # Reuse a previous answer to the same question about the same images
+        cache_key: tuple[str, ...] = ()
+        if self._response_cache_size > 0:
+            hashes = await asyncio.gather(*[self._image_hash(p) for p in image_paths])
+            cache_key = ("analyze_batch", *hashes, _prompt_key(prompt))
+            cached = self._cached_response(cache_key)
+            if cached is not None:
+                logger.info(f"VLM batch analysis served from cache for {len(image_paths)} images")
+                return ToolResult(
+                    success=True, output={"analysis": cached, "count": len(image_paths)}
+                )
+
+        # Read all images concurrently, labeling each so the answer can refer to it
+        parts = await asyncio.gather(*[self._image_part(client, p) for p in image_paths])
+        contents: list[Any] = [prompt]
+        for index, (image_path, part) in enumerate(zip(image_paths, parts, strict=True), 1):
+            contents.extend([part, f"^ IMAGE {index}: {image_path.name}"])
+
+        # VLM analysis
+        response = await self._generate_content(client, contents)
+        self._store_response(cache_key, response.text)
+
+        logger.info(f"VLM batch analysis completed for {len(image_paths)} images")
+        return ToolResult(
+            success=True, output={"analysis": response.text, "count": len(image_paths)}
+        )
+
+    async def _compare(
+        self, input_data: dict[str, Any], prompt: str, client: genai.Client
+    ) -> ToolResult:
+        """Compare two images.
+
+        Args:
+            input_data: Input parameters matching input_schema
+            prompt: Operation prompt
+            client: Gemini client
+
+        Returns:
+            ToolResult with success status and output/error
+        """
+        # Resolve paths before announcing the comparison
+        image1_path, image2_path = await asyncio.gather(
+            self._resolve_image(input_data["image1_path"]),
+            self._resolve_image(input_data["image2_path"]),
+        )
+        if isinstance(image1_path, ToolResult):
+            return image1_path
+        if isinstance(image2_path, ToolResult):
+            return image2_path
+
+        # Emit event before comparison
+        await self.coordinator.hooks.emit(
+            "tool.vlm.compare",
+            {
+                "image1_path": str(image1_path),
+                "image2_path": str(image2_path),
+                "model": self.model,
+                "prompt_length": len(prompt),
+            },
+        )
+
+        # Labels
+        label1 = input_data.get("image1_label", _DEFAULT_LABEL_1)
+        label2 = input_data.get("image2_label", _DEFAULT_LABEL_2)
+
+        same_image = image1_path == image2_path
+        skip_identical = input_data.get("skip_identical", True)
+        hash1 = hash2 = ""
+        if skip_identical or self._response_cache_size > 0:
+            hash1, hash2 = await asyncio.gather(
+                self._image_hash(image1_path), self._image_hash(image2_path)
+            )
+            same_image = same_image or hash1 == hash2
+
+        # Identical content needs no model call
+        if same_image and skip_identical:
+            logger.info(f"VLM comparison skipped for identical {image1_path} and {image2_path}")
+            return ToolResult(success=True, output={"comparison": _IDENTICAL_COMPARISON})
+
+        # Reuse a previous answer to the same comparison
+        cache_key: tuple[str, ...] = ()
+        if self._response_cache_size > 0:
+            cache_key = ("compare", hash1, hash2, label1, label2, _prompt_key(prompt))
+            cached = self._cached_response(cache_key)
+            if cached is not None:
+                logger.info(f"VLM comparison served from cache for {image1_path} vs {image2_path}")
+                return ToolResult(success=True, output={"comparison": cached})
+
+        if same_image:
+            # Send identical content once, labeled as both images
+            image_part = await self._image_part(client, image1_path)
+            contents = [prompt, image_part, f"^ {label1} and {label2} (identical images)"]
+        else:
+            # Read both images concurrently
+            image1_part, image2_part = await asyncio.gather(
+                self._image_part(client, image1_path),
+                self._image_part(client, image2_path),
             )
-            return ToolResult(success=False, output=error_msg, error={"message": error_msg})
+            mark1 = _DEFAULT_MARK_1 if label1 == _DEFAULT_LABEL_1 else f"^ {label1}"
+            mark2 = _DEFAULT_MARK_2 if label2 == _DEFAULT_LABEL_2 else f"^ {label2}"
+            contents = [prompt, image1_part, mark1, image2_part, mark2]
 
-        client = genai.Client(api_key=self.api_key)
+        # VLM comparison
+        response = await self._generate_content(client, contents)
+        self._store_response(cache_key, response.text)
 
-        operation = input_data.get("operation")
-        prompt = input_data.get("prompt", "")
+        logger.info(f"VLM comparison completed for {image1_path} vs {image2_path}")
+        return ToolResult(success=True, output={"comparison": response.text})
+
+    async def _generate(
+        self, input_data: dict[str, Any], prompt: str, client: genai.Client
+    ) -> ToolResult:
+        """Generate images from a text prompt and optional reference image.
+
+        Args:
+            input_data: Input parameters matching input_schema
+            prompt: Operation prompt
+            client: Gemini client
 
+        Returns:
+            ToolResult with success status and output/error
+        """
+        # Resolve output path
+        output_path = self._resolve_path(input_data["output_path"])
+
+        # Get number of images to generate
+        number_of_images = input_data.get("number_of_images", 1)
+
+        # Check for optional reference image
+        reference_image_path_str = input_data.get("reference_image_path")
+        reference_image_part = None
+
+        if reference_image_path_str:
+            reference_image_path = await self._resolve_image(reference_image_path_str)
+            if isinstance(reference_image_path, ToolResult):
+                return reference_image_path
+            reference_image_part = await self._image_part(client, reference_image_path)
+
+        # Emit event before generation
+        event_data = {
+            "output_path": str(output_path),
+            "model": self.model,
+            "prompt_length": len(prompt),
+            "number_of_images": number_of_images,
+        }
+        if reference_image_path_str:
+            event_data["reference_image_path"] = str(reference_image_path)
+
+        await self.coordinator.hooks.emit("tool.vlm.generate", event_data)
+
+        # Build contents array for generation
+        contents: list[Any] = [prompt]
+        if reference_image_part is not None:
+            contents.append(reference_image_part)
+
+        # Generate image(s) using Gemini (Nano Banana Pro). Ask for all
+        # images as candidates of a single request so the server batches them.
+        config = genai.types.GenerateContentConfig(
+            candidate_count=number_of_images,
+            response_modalities=_GENERATE_MODALITIES,
+        )
         try:
-            if operation == "analyze":
-                image_path_str = input_data.get("image_path")
-                if not image_path_str:
-                    error_msg = "image_path required for analyze operation"
-                    return ToolResult(success=False, output=error_msg, error={"message": error_msg})
-
-                # Resolve path and read image
-                image_path = self._resolve_path(image_path_str)
-
-                # Emit event before analysis
-                await self.coordinator.hooks.emit(
-                    "tool.vlm.analyze",
-                    {
-                        "image_path": str(image_path),
-                        "model": self.model,
-                        "prompt_length": len(prompt),
-                    },
+            responses = [await self._generate_content(client, contents, config)]
+            # A model that ignores candidate_count answers with fewer candidates
+            # that all finished normally; refusals and text-only answers are final
+            candidates = len(responses[0].candidates or [])
+            missing = 0
+            if candidates > 0 and _finish_reason(responses) is None:
+                missing = number_of_images - candidates
+        except genai.errors.ClientError as e:
+            # Only the "multiple candidates not supported" rejection falls back;
+            # rate limits, auth and prompt errors must not fan out into more calls
+            if number_of_images == 1 or not _is_candidate_count_unsupported(e):
+                raise
+            responses = []
+            missing = number_of_images
+
+        # Request the images the batched call did not return in parallel
+        if missing > 0:
+            responses.extend(
+                await asyncio.gather(
+                    *[
+                        self._generate_content(client, contents, _SINGLE_IMAGE_CONFIG)
+                        for _ in range(missing)
+                    ]
                 )
+            )
 
-                with open(image_path, "rb") as f:
-                    image_data = f.read()
+        for response in responses:
+            await self._emit_usage("generate", response)
+
+        # Collect generated images, then write them concurrently
+        jobs: list[tuple[Path, bytes]] = []
+        text: str | None = None
+
+        for part in _response_parts(responses):
+            if (
+                part.inline_data is not None
+                and part.inline_data.data is not None
+                and len(jobs) < number_of_images
+            ):
+                # Determine output path for this image
+                if number_of_images == 1:
+                    current_output = output_path
+                else:
+                    # For multiple images, add suffix: image_1.png, image_2.png, etc.
+                    stem = output_path.stem
+                    suffix = output_path.suffix
+                    current_output = output_path.parent / f"{stem}_{len(jobs) + 1}{suffix}"
+
+                jobs.append((current_output, part.inline_data.data))
+            elif part.text is not None and text is None:
+                text = part.text
+
+            # Stop once we have enough images and the model's text
+            if len(jobs) >= number_of_images and text is not None:
+                break
+
+        # Bail out before touching the filesystem if the model returned no images
+        if not jobs:
+            error_msg = "No images were generated by the model"
+            finish_reason = _finish_reason(responses)
+            if finish_reason:
+                error_msg += f" (finish reason: {finish_reason})"
+            logger.error(error_msg)
+            return _err(error_msg)
 
-                mime_type = self._get_mime_type(image_path)
+        # Ensure the output directory exists (every image shares its parent)
+        await asyncio.to_thread(output_path.parent.mkdir, parents=True, exist_ok=True)
 
-                # VLM analysis
-                response = client.models.generate_content(
-                    model=self.model,
-                    contents=[
-                        prompt,
-                        {"inline_data": {"mime_type": mime_type, "data": image_data}},
-                    ],
-                )
+        # Save the images
+        await asyncio.gather(*[asyncio.to_thread(path.write_bytes, data) for path, data in jobs])
+        generated_paths = [str(path) for path, _ in jobs]
 
-                logger.info(f"VLM analysis completed for {image_path}")
-                return ToolResult(success=True, output={"analysis": response.text})
-
-            elif operation == "compare":
-                image1_path_str = input_data.get("image1_path")
-                image2_path_str = input_data.get("image2_path")
-
-                if not image1_path_str or not image2_path_str:
-                    error_msg = "image1_path and image2_path required for compare operation"
-                    return ToolResult(success=False, output=error_msg, error={"message": error_msg})
-
-                # Resolve paths
-                image1_path = self._resolve_path(image1_path_str)
-                image2_path = self._resolve_path(image2_path_str)
-
-                # Emit event before comparison
-                await self.coordinator.hooks.emit(
-                    "tool.vlm.compare",
-                    {
-                        "image1_path": str(image1_path),
-                        "image2_path": str(image2_path),
-                        "model": self.model,
-                        "prompt_length": len(prompt),
-                    },
-                )
+        logger.info(f"Generated {len(generated_paths)} image(s)")
 
-                # Read images
-                with open(image1_path, "rb") as f:
-                    image1_data = f.read()
-
-                with open(image2_path, "rb") as f:
-                    image2_data = f.read()
-
-                # Get MIME types
-                mime_type1 = self._get_mime_type(image1_path)
-                mime_type2 = self._get_mime_type(image2_path)
-
-                # Labels
-                label1 = input_data.get("image1_label", "IMAGE 1")
-                label2 = input_data.get("image2_label", "IMAGE 2")
-
-                # VLM comparison
-                response = client.models.generate_content(
-                    model=self.model,
-                    contents=[
-                        prompt,
-                        {"inline_data": {"mime_type": mime_type1, "data": image1_data}},
-                        f"^ {label1}",
-                        {"inline_data": {"mime_type": mime_type2, "data": image2_data}},
-                        f"^ {label2}",
-                    ],
-                )
+        result_output: dict[str, Any] = {
+            "generated_images": generated_paths,
+            "count": len(generated_paths),
+        }
 
-                logger.info(f"VLM comparison completed for {image1_path} vs {image2_path}")
-                return ToolResult(success=True, output={"comparison": response.text})
-
-            elif operation == "generate":
-                output_path_str = input_data.get("output_path")
-                if not output_path_str:
-                    error_msg = "output_path required for generate operation"
-                    return ToolResult(success=False, output=error_msg, error={"message": error_msg})
-
-                # Resolve output path
-                output_path = self._resolve_path(output_path_str)
-
-                # Get number of images to generate
-                number_of_images = input_data.get("number_of_images", 1)
-                if number_of_images < 1 or number_of_images > 4:
-                    error_msg = "number_of_images must be between 1 and 4"
-                    return ToolResult(success=False, output=error_msg, error={"message": error_msg})
-
-                # Check for optional reference image
-                reference_image_path_str = input_data.get("reference_image_path")
-                reference_image_data = None
-                reference_mime_type = None
-
-                if reference_image_path_str:
-                    reference_image_path = self._resolve_path(reference_image_path_str)
-                    with open(reference_image_path, "rb") as f:
-                        reference_image_data = f.read()
-                    reference_mime_type = self._get_mime_type(reference_image_path)
-
-                # Emit event before generation
-                event_data = {
-                    "output_path": str(output_path),
-                    "model": self.model,
-                    "prompt_length": len(prompt),
-                    "number_of_images": number_of_images,
-                }
-                if reference_image_path_str:
-                    event_data["reference_image_path"] = str(reference_image_path)
-
-                await self.coordinator.hooks.emit("tool.vlm.generate", event_data)
-
-                # Build contents array for generation
-                contents = [prompt]
-                if reference_image_data:
-                    contents.append(
-                        {
-                            "inline_data": {
-                                "mime_type": reference_mime_type,
-                                "data": reference_image_data,
-                            }
-                        }
-                    )
-
-                # Generate image(s) using Gemini (Nano Banana Pro)
-                response = client.models.generate_content(
-                    model=self.model,
-                    contents=contents,
-                )
+        # Include any text response from the model
+        if text is not None:
+            result_output["text"] = text
 
-                # Process generated images
-                generated_paths = []
-                image_count = 0
-
-                for part in response.parts:
-                    if part.inline_data is not None:
-                        # Get the image data
-                        image_data = part.inline_data.data
-
-                        # Determine output path for this image
-                        if number_of_images == 1:
-                            current_output = output_path
-                        else:
-                            # For multiple images, add suffix: image_1.png, image_2.png, etc.
-                            stem = output_path.stem
-                            suffix = output_path.suffix
-                            current_output = (
-                                output_path.parent / f"{stem}_{image_count + 1}{suffix}"
-                            )
-
-                        # Ensure parent directory exists
-                        current_output.parent.mkdir(parents=True, exist_ok=True)
-
-                        # Save the image
-                        with open(current_output, "wb") as f:
-                            f.write(image_data)
-
-                        generated_paths.append(str(current_output))
-                        image_count += 1
-
-                        # Stop if we've generated enough images
-                        if image_count >= number_of_images:
-                            break
-
-                if not generated_paths:
-                    error_msg = "No images were generated by the model"
-                    logger.error(error_msg)
-                    return ToolResult(success=False, output=error_msg, error={"message": error_msg})
-
-                logger.info(f"Generated {len(generated_paths)} image(s)")
-
-                result_output = {
-                    "generated_images": generated_paths,
-                    "count": len(generated_paths),
-                }
-
-                # Include any text response from the model
-                for part in response.parts:
-                    if part.text is not None:
-                        result_output["text"] = part.text
-                        break
-
-                return ToolResult(success=True, output=result_output)
-
-            else:
-                error_msg = (
-                    f"Unknown operation: {operation}. Use 'analyze', 'compare', or 'generate'"
-                )
-                return ToolResult(success=False, output=error_msg, error={"message": error_msg})
+        return ToolResult(success=True, output=result_output)
+
+    async def execute(self, input_data: dict[str, Any]) -> ToolResult:
+        """Execute VLM operation.
+
+        Args:
+            input_data: Input parameters matching input_schema
+
+        Returns:
+            ToolResult with success status and output/error
+        """
+        operation = input_data.get("operation")
+        prompt = input_data.get("prompt", "")
+
+        # Reject bad requests before paying for client setup
+        if not isinstance(operation, str) or operation not in self._dispatch:
+            return _err(
+                f"Unknown operation: {operation}. "
+                "Use 'analyze', 'analyze_batch', 'compare', or 'generate'"
+            )
+        handler = self._dispatch[operation]
+        error = _validate_input(operation, input_data)
+        if error is not None:
+            return _err(error)
+
+        # Check API key
+        if not self.api_key:
+            return _err(
+                "GOOGLE_API_KEY environment variable not set. "
+                "Get your API key from: https://aistudio.google.com/apikey"
+            )
+
+        client = self._get_client()
+
+        try:
+            return await handler(input_data, prompt, client)
 
         except FileNotFoundError as e:
             error_msg = f"Image file not found: {e}"
@@ -384,7 +1120,7 @@ class NanoBananaTool:
             await self.coordinator.hooks.emit(
                 "tool.vlm.error", {"error": error_msg, "operation": operation}
             )
-            return ToolResult(success=False, output=error_msg, error={"message": error_msg})
+            return _err(error_msg)
 
         except Exception as e:
             error_msg = f"VLM request failed: {e}"
@@ -392,4 +1128,4 @@ class NanoBananaTool:
             await self.coordinator.hooks.emit(
                 "tool.vlm.error", {"error": error_msg, "operation": operation}
             )
-            return ToolResult(success=False, output=error_msg, error={"message": error_msg})
+            return _err(error_msg)
@@ -3,6 +3,7 @@
 
 import asyncio
 import os
+from pathlib import Path
 
 
 async def generate_small_banana() -> None:
@@ -32,26 +33,35 @@ async def generate_small_banana() -> None:
     print()
     
     try:
-        response = client.models.generate_content(
+        response = await client.aio.models.generate_content(
             model="gemini-2.5-flash-image",
             contents=[prompt],
         )
         
         # Save generated images
-        output_dir = "output"
-        os.makedirs(output_dir, exist_ok=True)
+        output_dir = Path("output")
+        output_dir.mkdir(exist_ok=True)
         
-        image_count = 0
-        for part in response.parts:
-            if part.inline_data is not None:
-                image_data = part.inline_data.data
-                output_path = f"{output_dir}/small-banana.png"
-                
-                with open(output_path, "wb") as f:
-                    f.write(image_data)
-                
-                image_count += 1
-                print(f"✅ Generated: {output_path}")
+        images = [
+            part.inline_data.data
+            for part in response.parts or []
+            if part.inline_data is not None and part.inline_data.data is not None
+        ]
+        # Number outputs only when there are several, so they don't overwrite each other
+        output_paths = (
+            [output_dir / "small-banana.png"]
+            if len(images) == 1
+            else [output_dir / f"small-banana_{i}.png" for i in range(1, len(images) + 1)]
+        )
+        await asyncio.gather(
+            *[
+                asyncio.to_thread(output_path.write_bytes, image_data)
+                for output_path, image_data in zip(output_paths, images, strict=True)
+            ]
+        )
+        for output_path in output_paths:
+            print(f"✅ Generated: {output_path}")
+        image_count = len(images)
         
         if image_count == 0:
             print("❌ No images were generated")
@@ -0,0 +1,179 @@
+"""Tests for BatchQueue."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from google import genai  # type: ignore[import-untyped]
+
+from amplifier_module_tool_nano_banana import batch as batch_module
+from amplifier_module_tool_nano_banana.batch import BatchQueue
+
+
+def _text_response(text: str) -> genai.types.GenerateContentResponse:
+    """Build a model response with a single text part."""
+    return genai.types.GenerateContentResponse(
+        candidates=[
+            genai.types.Candidate(
+                content=genai.types.Content(role="model", parts=[genai.types.Part(text=text)])
+            )
+        ]
+    )
+
+
+@pytest.mark.asyncio
+async def test_full_batch_is_submitted_as_one_job() -> None:
+    """Test that queued requests share one batch job and get their own responses."""
+    client = MagicMock()
+    client.aio.batches.create = AsyncMock(
+        return_value=genai.types.BatchJob(
+            name="batches/1",
+            state=genai.types.JobState.JOB_STATE_SUCCEEDED,
+            dest=genai.types.BatchJobDestination(
+                inlined_responses=[
+                    genai.types.InlinedResponse(response=_text_response("first")),
+                    genai.types.InlinedResponse(response=_text_response("second")),
+                ]
+            ),
+        )
+    )
+    queue = BatchQueue("test-model", max_size=2, max_wait=60)
+
+    first, second = await asyncio.gather(
+        queue.submit(client, ["one"]), queue.submit(client, ["two"])
+    )
+
+    assert first.text == "first"
+    assert second.text == "second"
+    client.aio.batches.create.assert_awaited_once()
+    assert len(client.aio.batches.create.call_args.kwargs["src"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_request_raises() -> None:
+    """Test that a per-request batch error surfaces to its caller."""
+    client = MagicMock()
+    client.aio.batches.create = AsyncMock(
+        return_value=genai.types.BatchJob(
+            name="batches/1",
+            state=genai.types.JobState.JOB_STATE_SUCCEEDED,
+            dest=genai.types.BatchJobDestination(
+                inlined_responses=[
+                    genai.types.InlinedResponse(error=genai.types.JobError(message="bad input"))
+                ]
+            ),
+        )
+    )
+    queue = BatchQueue("test-model", max_size=1)
+
+    with pytest.raises(RuntimeError, match="bad input"):
+        await queue.submit(client, ["one"])
+
+
+@pytest.mark.asyncio
+async def test_partial_batch_flushes_after_max_wait(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that a batch below max_size is flushed by the timer and polled to completion."""
+    monkeypatch.setattr(batch_module, "_POLL_INTERVAL", 0)
+    client = MagicMock()
+    client.aio.batches.create = AsyncMock(
+        return_value=genai.types.BatchJob(
+            name="batches/1", state=genai.types.JobState.JOB_STATE_RUNNING
+        )
+    )
+    client.aio.batches.get = AsyncMock(
+        side_effect=[
+            genai.types.BatchJob(name="batches/1", state=genai.types.JobState.JOB_STATE_RUNNING),
+            genai.types.BatchJob(
+                name="batches/1",
+                state=genai.types.JobState.JOB_STATE_SUCCEEDED,
+                dest=genai.types.BatchJobDestination(
+                    inlined_responses=[genai.types.InlinedResponse(response=_text_response("done"))]
+                ),
+            ),
+        ]
+    )
+    queue = BatchQueue("test-model", max_size=10, max_wait=0.01)
+
+    response = await queue.submit(client, ["one"])
+
+    assert response.text == "done"
+    client.aio.batches.create.assert_awaited_once()
+    assert client.aio.batches.get.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_job_cancels_waiting_callers() -> None:
+    """Test that cancelling a running batch job does not leave callers pending."""
+    client = MagicMock()
+    created = asyncio.Event()
+
+    async def create(**_: object) -> genai.types.BatchJob:
+        created.set()
+        await asyncio.Event().wait()
+        raise AssertionError("unreachable")
+
+    client.aio.batches.create = create
+    queue = BatchQueue("test-model", max_size=1)
+
+    caller = asyncio.ensure_future(queue.submit(client, ["one"]))
+    await created.wait()
+    for job in list(queue._jobs):  # pyright: ignore[reportPrivateUsage]
+        job.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await asyncio.wait_for(caller, timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_requests_are_batched_per_client() -> None:
+    """Test that requests from different clients are never sent in the same job."""
+
+    def make_client(text: str) -> MagicMock:
+        client = MagicMock()
+        client.aio.batches.create = AsyncMock(
+            return_value=genai.types.BatchJob(
+                name=f"batches/{text}",
+                state=genai.types.JobState.JOB_STATE_SUCCEEDED,
+                dest=genai.types.BatchJobDestination(
+                    inlined_responses=[genai.types.InlinedResponse(response=_text_response(text))]
+                ),
+            )
+        )
+        return client
+
+    first_client, second_client = make_client("first"), make_client("second")
+    queue = BatchQueue("test-model", max_size=2, max_wait=0.01)
+
+    first, second = await asyncio.gather(
+        queue.submit(first_client, ["one"]), queue.submit(second_client, ["two"])
+    )
+
+    assert first.text == "first"
+    assert second.text == "second"
+    assert len(first_client.aio.batches.create.call_args.kwargs["src"]) == 1
+    assert len(second_client.aio.batches.create.call_args.kwargs["src"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_job_timeout_fails_waiting_callers(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that a job still running after job_timeout fails its requests."""
+    monkeypatch.setattr(batch_module, "_POLL_INTERVAL", 0)
+    running = genai.types.BatchJob(name="batches/1", state=genai.types.JobState.JOB_STATE_RUNNING)
+    client = MagicMock()
+    client.aio.batches.create = AsyncMock(return_value=running)
+    client.aio.batches.get = AsyncMock(return_value=running)
+    queue = BatchQueue("test-model", max_size=1, job_timeout=0.01)
+
+    with pytest.raises(RuntimeError, match="did not finish"):
+        await asyncio.wait_for(queue.submit(client, ["one"]), timeout=5)
+
+
+@pytest.mark.asyncio
+async def test_unknown_job_state_fails_waiting_callers() -> None:
+    """Test that a job without a recognizable state fails instead of polling forever."""
+    client = MagicMock()
+    client.aio.batches.create = AsyncMock(return_value=genai.types.BatchJob(name="batches/1"))
+    queue = BatchQueue("test-model", max_size=1)
+
+    with pytest.raises(RuntimeError, match="unexpected state"):
+        await asyncio.wait_for(queue.submit(client, ["one"]), timeout=5)
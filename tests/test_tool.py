@@ -1,11 +1,47 @@
 """Tests for NanoBananaTool."""
 
+import asyncio
+import tracemalloc
+from pathlib import Path
 from typing import Any
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
+from google import genai  # type: ignore[import-untyped]
 
 from amplifier_module_tool_nano_banana import NanoBananaTool
+from amplifier_module_tool_nano_banana import tool as tool_module
+
+
+def _image_response(*images: bytes) -> genai.types.GenerateContentResponse:
+    """Build a model response with one image candidate per payload."""
+    return genai.types.GenerateContentResponse(
+        candidates=[
+            genai.types.Candidate(
+                content=genai.types.Content(
+                    role="model",
+                    parts=[genai.types.Part.from_bytes(data=image, mime_type="image/png")],
+                )
+            )
+            for image in images
+        ]
+    )
+
+
+def _text_response(text: str) -> genai.types.GenerateContentResponse:
+    """Build a model response with a single text part."""
+    return genai.types.GenerateContentResponse(
+        candidates=[
+            genai.types.Candidate(
+                content=genai.types.Content(role="model", parts=[genai.types.Part(text=text)])
+            )
+        ]
+    )
+
+
+def _use_client(tool: NanoBananaTool, client: Any) -> None:
+    """Make the tool use a mock Gemini client."""
+    tool._get_client = lambda: client  # type: ignore[method-assign]
 
 
 def _create_mock_coordinator() -> Any:
@@ -37,6 +73,7 @@ def test_input_schema() -> None:
     # Operations
     operations = schema["properties"]["operation"]["enum"]
     assert "analyze" in operations
+    assert "analyze_batch" in operations
     assert "compare" in operations
     assert "generate" in operations
 
@@ -98,3 +135,748 @@ async def test_generate_validates_number_of_images() -> None:
 
     assert not result.success
     assert "number_of_images" in result.output
+
+
+def test_client_is_reused() -> None:
+    """Test that the Gemini client is created once and shared per API key."""
+    tool = NanoBananaTool({"api_key": "test-key"}, _create_mock_coordinator())
+
+    other = NanoBananaTool({"api_key": "test-key"}, _create_mock_coordinator())
+    get_client = tool._get_client  # pyright: ignore[reportPrivateUsage]
+
+    assert get_client() is get_client()
+    assert other._get_client() is get_client()  # pyright: ignore[reportPrivateUsage]
+
+
+def test_client_follows_api_key_changes(monkeypatch: Any) -> None:
+    """Test that a rotated GOOGLE_API_KEY is picked up with a new client."""
+    tool = NanoBananaTool({}, _create_mock_coordinator())
+    get_client = tool._get_client  # pyright: ignore[reportPrivateUsage]
+
+    monkeypatch.setenv("GOOGLE_API_KEY", "old-key")
+    old = get_client()
+    monkeypatch.setenv("GOOGLE_API_KEY", "new-key")
+
+    assert tool.api_key == "new-key"
+    new = get_client()
+    assert new is not old
+    cache = tool_module._CLIENT_CACHE  # pyright: ignore[reportPrivateUsage]
+    assert old not in cache.values()
+    assert new in cache.values()
+
+
+def test_clients_for_different_tools_keys_coexist() -> None:
+    """Test that tools configured with different keys on one loop keep their clients."""
+    first = NanoBananaTool({"api_key": "key-a"}, _create_mock_coordinator())
+    second = NanoBananaTool({"api_key": "key-b"}, _create_mock_coordinator())
+    client_a = first._get_client()  # pyright: ignore[reportPrivateUsage]
+    client_b = second._get_client()  # pyright: ignore[reportPrivateUsage]
+
+    assert first._get_client() is client_a  # pyright: ignore[reportPrivateUsage]
+    assert second._get_client() is client_b  # pyright: ignore[reportPrivateUsage]
+
+
+def test_client_is_not_shared_across_event_loops() -> None:
+    """Test that each event loop gets its own client and closed loops are evicted."""
+    tool = NanoBananaTool({"api_key": "loop-key"}, _create_mock_coordinator())
+
+    async def get_client() -> Any:
+        return tool._get_client()  # pyright: ignore[reportPrivateUsage]
+
+    first = asyncio.run(get_client())
+    second = asyncio.run(get_client())
+
+    assert first is not second
+    cache = tool_module._CLIENT_CACHE  # pyright: ignore[reportPrivateUsage]
+    assert first not in cache.values()
+    assert second in cache.values()
+
+
+def test_get_mime_type() -> None:
+    """Test MIME detection from file extension."""
+    tool = NanoBananaTool({}, _create_mock_coordinator())
+    get_mime_type = tool._get_mime_type  # pyright: ignore[reportPrivateUsage]
+
+    assert get_mime_type(Path("mockup.PNG")) == "image/png"
+    assert get_mime_type(Path("shot.jpg")) == "image/jpeg"
+    assert get_mime_type(Path("unknown")) == "image/png"
+    assert get_mime_type("design.webp") == "image/webp"
+
+
+@pytest.mark.asyncio
+async def test_image_part_inlines_small_images(tmp_path: Path) -> None:
+    """Test that small images are sent inline rather than uploaded."""
+    image_path = tmp_path / "mockup.png"
+    image_path.write_bytes(b"\x89PNG\r\n\x1a\n")
+    client = MagicMock()
+
+    tool = NanoBananaTool({}, _create_mock_coordinator())
+    part = await tool._image_part(client, image_path)  # pyright: ignore[reportPrivateUsage]
+
+    assert isinstance(part, genai.types.Part)
+    assert part.inline_data is not None
+    assert part.inline_data.mime_type == "image/png"
+    assert part.inline_data.data == b"\x89PNG\r\n\x1a\n"
+    client.aio.files.upload.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_image_part_sniffs_mime_from_content(tmp_path: Path) -> None:
+    """Test that signature bytes take precedence over a misleading extension."""
+    image_path = tmp_path / "screenshot.png"
+    image_path.write_bytes(b"\xff\xd8\xff\xe0" + b"\x00" * 16)
+
+    tool = NanoBananaTool({}, _create_mock_coordinator())
+    part = await tool._image_part(MagicMock(), image_path)  # pyright: ignore[reportPrivateUsage]
+
+    assert isinstance(part, genai.types.Part)
+    assert part.inline_data is not None
+    assert part.inline_data.mime_type == "image/jpeg"
+
+
+@pytest.mark.asyncio
+async def test_inline_part_is_cached(tmp_path: Path) -> None:
+    """Test that an unchanged inline image reuses its Part without copying the bytes."""
+    image_path = tmp_path / "cached.png"
+    image_path.write_bytes(b"\x89PNG\r\n\x1a\n" + b"\x01" * 8)
+
+    tool = NanoBananaTool({}, _create_mock_coordinator())
+    first = await tool._image_part(MagicMock(), image_path)  # pyright: ignore[reportPrivateUsage]
+    second = await tool._image_part(MagicMock(), image_path)  # pyright: ignore[reportPrivateUsage]
+
+    assert first is second
+    image = tool_module._load_image(image_path)  # pyright: ignore[reportPrivateUsage]
+    assert image.part.inline_data is not None
+    assert image.part.inline_data.data is image.data
+
+
+def test_load_image_holds_a_single_copy(tmp_path: Path) -> None:
+    """Test that loading an image and building its Part allocates the bytes only once."""
+    image_path = tmp_path / "large.png"
+    size = 2 * 1024 * 1024
+    image_path.write_bytes(b"\x89PNG\r\n\x1a\n" + b"\x00" * size)
+
+    tracemalloc.start()
+    try:
+        tool_module._load_image(image_path)  # pyright: ignore[reportPrivateUsage]
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert peak < size * 1.5
+
+
+@pytest.mark.asyncio
+async def test_large_image_upload_is_reused(tmp_path: Path, monkeypatch: Any) -> None:
+    """Test that unchanged large images are uploaded once and reused."""
+    monkeypatch.setattr(tool_module, "_INLINE_MAX_BYTES", 0)
+    image_path = tmp_path / "mockup.png"
+    image_path.write_bytes(b"\x89PNG\r\n\x1a\n")
+    client = MagicMock()
+    client.aio.files.upload = AsyncMock(return_value=genai.types.File(name="files/mockup"))
+
+    tool = NanoBananaTool({}, _create_mock_coordinator())
+    first = await tool._image_part(client, image_path)  # pyright: ignore[reportPrivateUsage]
+    second = await tool._image_part(client, image_path)  # pyright: ignore[reportPrivateUsage]
+
+    assert first is second
+    client.aio.files.upload.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_generate_batches_images_as_candidates(tmp_path: Path) -> None:
+    """Test that multiple images are requested as candidates of one call."""
+    tool = NanoBananaTool({"api_key": "test-key"}, _create_mock_coordinator())
+    client = MagicMock()
+    client.aio.models.generate_content = AsyncMock(return_value=_image_response(b"one", b"two"))
+    _use_client(tool, client)
+
+    result = await tool.execute(
+        {
+            "operation": "generate",
+            "prompt": "A banana",
+            "output_path": str(tmp_path / "banana.png"),
+            "number_of_images": 2,
+        }
+    )
+
+    assert result.success
+    assert result.output["count"] == 2
+    assert (tmp_path / "banana_1.png").read_bytes() == b"one"
+    assert (tmp_path / "banana_2.png").read_bytes() == b"two"
+    client.aio.models.generate_content.assert_awaited_once()
+    config = client.aio.models.generate_content.call_args.kwargs["config"]
+    assert config.candidate_count == 2
+
+
+def test_input_schema_is_shared() -> None:
+    """Test that the input schema is built once rather than per access."""
+    tool = NanoBananaTool({}, _create_mock_coordinator())
+
+    assert tool.input_schema is tool.input_schema
+
+
+@pytest.mark.asyncio
+async def test_unknown_operation() -> None:
+    """Test that unknown operations are rejected."""
+    tool = NanoBananaTool({"api_key": "test-key"}, _create_mock_coordinator())
+
+    result = await tool.execute({"operation": "resize", "prompt": "test"})
+
+    assert not result.success
+    assert "Unknown operation" in result.output
+
+    result = await tool.execute({"operation": ["analyze"], "prompt": "test"})
+
+    assert not result.success
+    assert "Unknown operation" in result.output
+
+
+@pytest.mark.asyncio
+async def test_analyze_reuses_cached_response(tmp_path: Path) -> None:
+    """Test that repeating a question about the same image skips the model call."""
+    image_path = tmp_path / "mockup.png"
+    image_path.write_bytes(b"\x89PNG\r\n\x1a\n")
+    tool = NanoBananaTool({"api_key": "test-key"}, _create_mock_coordinator())
+    client = MagicMock()
+    client.aio.models.generate_content = AsyncMock(return_value=_text_response("A login form"))
+    _use_client(tool, client)
+
+    first = await tool.execute(
+        {"operation": "analyze", "image_path": str(image_path), "prompt": "List components"}
+    )
+    second = await tool.execute(
+        {"operation": "analyze", "image_path": str(image_path), "prompt": "  list components "}
+    )
+
+    assert first.output == second.output == {"analysis": "A login form"}
+    client.aio.models.generate_content.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_compare_reuses_cached_response(tmp_path: Path) -> None:
+    """Test that a repeated comparison is answered from cache, keyed by image content."""
+    image1_path = tmp_path / "mockup.png"
+    image1_path.write_bytes(b"\x89PNG\r\n\x1a\n1")
+    image2_path = tmp_path / "shot.png"
+    image2_path.write_bytes(b"\x89PNG\r\n\x1a\n2")
+    copy_path = tmp_path / "shot-copy.png"
+    copy_path.write_bytes(b"\x89PNG\r\n\x1a\n2")
+    tool = NanoBananaTool({"api_key": "test-key"}, _create_mock_coordinator())
+    client = MagicMock()
+    client.aio.models.generate_content = AsyncMock(return_value=_text_response("90% match"))
+    _use_client(tool, client)
+
+    def compare(second: Path, prompt: str) -> Any:
+        return tool.execute(
+            {
+                "operation": "compare",
+                "image1_path": str(image1_path),
+                "image2_path": str(second),
+                "prompt": prompt,
+            }
+        )
+
+    await compare(image2_path, "Match %?")
+    await compare(copy_path, "match %?")
+    assert client.aio.models.generate_content.await_count == 1
+
+    await compare(image2_path, "Biggest difference?")
+    assert client.aio.models.generate_content.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_analyze_missing_image_fails_before_event(tmp_path: Path) -> None:
+    """Test that a missing image is reported without emitting an analyze event."""
+    coordinator = _create_mock_coordinator()
+    tool = NanoBananaTool({"api_key": "test-key"}, coordinator)
+
+    result = await tool.execute(
+        {"operation": "analyze", "image_path": str(tmp_path / "missing.png"), "prompt": "test"}
+    )
+
+    assert not result.success
+    assert "Image file not found" in result.output
+    coordinator.hooks.emit.assert_not_called()
+
+
+def test_resolve_path_uses_working_dir(tmp_path: Path) -> None:
+    """Test that relative paths resolve against working_dir and absolute paths do not."""
+    tool = NanoBananaTool({"working_dir": str(tmp_path)}, _create_mock_coordinator())
+    resolve_path = tool._resolve_path  # pyright: ignore[reportPrivateUsage]
+
+    assert resolve_path("mockups/home.png") == tmp_path / "mockups" / "home.png"
+    assert resolve_path("/abs/home.png") == Path("/abs/home.png")
+
+
+@pytest.mark.asyncio
+async def test_generate_without_images_skips_filesystem(tmp_path: Path) -> None:
+    """Test that a text-only response fails without creating the output directory."""
+    tool = NanoBananaTool({"api_key": "test-key"}, _create_mock_coordinator())
+    client = MagicMock()
+    client.aio.models.generate_content = AsyncMock(return_value=_text_response("I can't draw"))
+    _use_client(tool, client)
+
+    result = await tool.execute(
+        {
+            "operation": "generate",
+            "prompt": "A banana",
+            "output_path": str(tmp_path / "out" / "banana.png"),
+        }
+    )
+
+    assert not result.success
+    assert "No images were generated" in result.output
+    assert not (tmp_path / "out").exists()
+    client.aio.models.generate_content.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_max_concurrency_bounds_model_calls(tmp_path: Path) -> None:
+    """Test that concurrent executions respect max_concurrency."""
+    image_path = tmp_path / "mockup.png"
+    image_path.write_bytes(b"\x89PNG\r\n\x1a\n")
+    tool = NanoBananaTool({"api_key": "test-key", "max_concurrency": 1}, _create_mock_coordinator())
+    in_flight = 0
+    peak = 0
+
+    async def generate_content(**_: Any) -> genai.types.GenerateContentResponse:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return _text_response("ok")
+
+    client = MagicMock()
+    client.aio.models.generate_content = generate_content
+    _use_client(tool, client)
+
+    results = await asyncio.gather(
+        *[
+            tool.execute({"operation": "analyze", "image_path": str(image_path), "prompt": f"q{i}"})
+            for i in range(3)
+        ]
+    )
+
+    assert all(result.success for result in results)
+    assert peak == 1
+
+
+def test_load_image_reuses_unchanged_files(tmp_path: Path) -> None:
+    """Test that image bytes are cached until the file changes."""
+    image_path = tmp_path / "mockup.png"
+    image_path.write_bytes(b"first")
+    load_image = tool_module._load_image  # pyright: ignore[reportPrivateUsage]
+
+    first = load_image(image_path)
+    assert load_image(image_path) is first
+
+    image_path.write_bytes(b"second!")
+    second = load_image(image_path)
+    assert second.data == b"second!"
+    assert second.digest != first.digest
+
+
+def _candidate_count_error() -> genai.errors.ClientError:
+    """Build the 400 a model returns when multiple candidates are not supported."""
+    return genai.errors.ClientError(
+        400,
+        {
+            "error": {
+                "code": 400,
+                "message": "Multiple candidates is not enabled for this model",
+                "status": "INVALID_ARGUMENT",
+            }
+        },
+    )
+
+
+@pytest.mark.asyncio
+async def test_generate_falls_back_when_candidates_unsupported(tmp_path: Path) -> None:
+    """Test that a candidate_count rejection falls back to single-image calls."""
+    tool = NanoBananaTool({"api_key": "test-key"}, _create_mock_coordinator())
+    client = MagicMock()
+    client.aio.models.generate_content = AsyncMock(
+        side_effect=[_candidate_count_error(), _image_response(b"one"), _image_response(b"two")]
+    )
+    _use_client(tool, client)
+
+    result = await tool.execute(
+        {
+            "operation": "generate",
+            "prompt": "A banana",
+            "output_path": str(tmp_path / "banana.png"),
+            "number_of_images": 2,
+        }
+    )
+
+    assert result.success
+    assert result.output["count"] == 2
+    assert client.aio.models.generate_content.await_count == 3
+    for call in client.aio.models.generate_content.call_args_list[1:]:
+        config = call.kwargs["config"]
+        assert config.candidate_count is None
+        assert config.response_modalities == ["TEXT", "IMAGE"]
+
+
+@pytest.mark.asyncio
+async def test_generate_refusal_is_not_retried(tmp_path: Path) -> None:
+    """Test that a refused multi-image request is not re-sent as single-image calls."""
+    tool = NanoBananaTool({"api_key": "test-key"}, _create_mock_coordinator())
+    refused = genai.types.GenerateContentResponse(
+        candidates=[genai.types.Candidate(finish_reason=genai.types.FinishReason.SAFETY)]
+    )
+    client = MagicMock()
+    client.aio.models.generate_content = AsyncMock(return_value=refused)
+    _use_client(tool, client)
+
+    result = await tool.execute(
+        {
+            "operation": "generate",
+            "prompt": "A banana",
+            "output_path": str(tmp_path / "banana.png"),
+            "number_of_images": 4,
+        }
+    )
+
+    assert not result.success
+    assert "No images were generated" in result.output
+    assert client.aio.models.generate_content.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_generate_tops_up_when_candidate_count_is_ignored(tmp_path: Path) -> None:
+    """Test that a model returning fewer candidates than asked gets the rest requested."""
+    tool = NanoBananaTool({"api_key": "test-key"}, _create_mock_coordinator())
+    client = MagicMock()
+    client.aio.models.generate_content = AsyncMock(
+        side_effect=[_image_response(b"one"), _image_response(b"two"), _image_response(b"three")]
+    )
+    _use_client(tool, client)
+
+    result = await tool.execute(
+        {
+            "operation": "generate",
+            "prompt": "A banana",
+            "output_path": str(tmp_path / "banana.png"),
+            "number_of_images": 3,
+        }
+    )
+
+    assert result.success
+    assert result.output["count"] == 3
+    assert client.aio.models.generate_content.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_generate_does_not_fan_out_on_rate_limit(tmp_path: Path) -> None:
+    """Test that a 429 on the batched call is reported, not retried as parallel calls."""
+    tool = NanoBananaTool({"api_key": "test-key", "max_retries": 0}, _create_mock_coordinator())
+    client = MagicMock()
+    client.aio.models.generate_content = AsyncMock(
+        side_effect=genai.errors.ClientError(
+            429,
+            {"error": {"code": 429, "message": "Quota exceeded", "status": "RESOURCE_EXHAUSTED"}},
+        )
+    )
+    _use_client(tool, client)
+
+    result = await tool.execute(
+        {
+            "operation": "generate",
+            "prompt": "A banana",
+            "output_path": str(tmp_path / "banana.png"),
+            "number_of_images": 3,
+        }
+    )
+
+    assert not result.success
+    client.aio.models.generate_content.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_analyze_directory_fails_before_event(tmp_path: Path) -> None:
+    """Test that a directory passed as an image is rejected without emitting an event."""
+    coordinator = _create_mock_coordinator()
+    tool = NanoBananaTool({"api_key": "test-key"}, coordinator)
+
+    result = await tool.execute(
+        {"operation": "analyze", "image_path": str(tmp_path), "prompt": "test"}
+    )
+
+    assert not result.success
+    assert "not a file" in result.output
+    coordinator.hooks.emit.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_batch_mode_routes_model_calls_through_batch_jobs(tmp_path: Path) -> None:
+    """Test that batch_mode sends execute() requests through Gemini batch jobs."""
+    image_path = tmp_path / "mockup.png"
+    image_path.write_bytes(b"\x89PNG\r\n\x1a\n")
+    tool = NanoBananaTool(
+        {"api_key": "test-key", "batch_mode": True, "batch_size": 1},
+        _create_mock_coordinator(),
+    )
+    client = MagicMock()
+    client.aio.models.generate_content = AsyncMock()
+    client.aio.batches.create = AsyncMock(
+        return_value=genai.types.BatchJob(
+            name="batches/1",
+            state=genai.types.JobState.JOB_STATE_SUCCEEDED,
+            dest=genai.types.BatchJobDestination(
+                inlined_responses=[
+                    genai.types.InlinedResponse(response=_text_response("A login form"))
+                ]
+            ),
+        )
+    )
+    _use_client(tool, client)
+
+    result = await tool.execute(
+        {"operation": "analyze", "image_path": str(image_path), "prompt": "List components"}
+    )
+
+    assert result.success
+    assert result.output == {"analysis": "A login form"}
+    client.aio.batches.create.assert_awaited_once()
+    client.aio.models.generate_content.assert_not_called()
+
+
+def test_env_int_falls_back_on_malformed_values(monkeypatch: Any) -> None:
+    """Test that a malformed integer environment variable uses the default."""
+    env_int = tool_module._env_int  # pyright: ignore[reportPrivateUsage]
+
+    monkeypatch.setenv("NANOBANANA_TEST_INT", "lots")
+    assert env_int("NANOBANANA_TEST_INT", 7) == 7
+
+    monkeypatch.setenv("NANOBANANA_TEST_INT", "42")
+    assert env_int("NANOBANANA_TEST_INT", 7) == 42
+
+    monkeypatch.setenv("NANOBANANA_TEST_INT", "0")
+    assert env_int("NANOBANANA_TEST_INT", 7, minimum=1) == 7
+
+
+def test_invalid_max_concurrency_uses_default() -> None:
+    """Test that a max_concurrency below 1 falls back instead of stalling or raising."""
+    for value in (0, -3):
+        tool = NanoBananaTool({"max_concurrency": value}, _create_mock_coordinator())
+
+        limit = tool._max_concurrency  # pyright: ignore[reportPrivateUsage]
+        assert limit == tool_module._MAX_CONCURRENCY  # pyright: ignore[reportPrivateUsage]
+
+
+@pytest.mark.asyncio
+async def test_overloaded_request_fails_fast(tmp_path: Path) -> None:
+    """Test that a request waiting past queue_timeout fails instead of queueing forever."""
+    image_path = tmp_path / "mockup.png"
+    image_path.write_bytes(b"\x89PNG\r\n\x1a\n")
+    tool = NanoBananaTool(
+        {"api_key": "test-key", "max_concurrency": 1, "queue_timeout": 0.01},
+        _create_mock_coordinator(),
+    )
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def generate_content(**_: Any) -> genai.types.GenerateContentResponse:
+        started.set()
+        await release.wait()
+        return _text_response("ok")
+
+    client = MagicMock()
+    client.aio.models.generate_content = generate_content
+    _use_client(tool, client)
+
+    def analyze(prompt: str) -> Any:
+        return tool.execute(
+            {"operation": "analyze", "image_path": str(image_path), "prompt": prompt}
+        )
+
+    # Wait until the first request actually holds the only slot
+    first = asyncio.ensure_future(analyze("first"))
+    await asyncio.wait_for(started.wait(), timeout=5)
+    second = await asyncio.wait_for(analyze("second"), timeout=5)
+    release.set()
+
+    assert not second.success
+    assert "Too many concurrent requests" in second.output
+    assert (await asyncio.wait_for(first, timeout=5)).success
+
+
+@pytest.mark.asyncio
+async def test_analyze_batch_sends_all_images_in_one_request(tmp_path: Path) -> None:
+    """Test that analyze_batch packs every labeled image into a single model call."""
+    paths = []
+    for index in range(3):
+        path = tmp_path / f"screen{index}.png"
+        path.write_bytes(b"\x89PNG\r\n\x1a\n" + bytes([index]))
+        paths.append(str(path))
+    tool = NanoBananaTool({"api_key": "test-key"}, _create_mock_coordinator())
+    client = MagicMock()
+    client.aio.models.generate_content = AsyncMock(return_value=_text_response("Three forms"))
+    _use_client(tool, client)
+
+    result = await tool.execute(
+        {"operation": "analyze_batch", "image_paths": paths, "prompt": "Describe each"}
+    )
+
+    assert result.success
+    assert result.output == {"analysis": "Three forms", "count": 3}
+    client.aio.models.generate_content.assert_awaited_once()
+    contents = client.aio.models.generate_content.call_args.kwargs["contents"]
+    assert sum(isinstance(item, genai.types.Part) for item in contents) == 3
+    assert "^ IMAGE 3: screen2.png" in contents
+
+
+@pytest.mark.asyncio
+async def test_analyze_batch_rejects_too_many_images() -> None:
+    """Test that analyze_batch enforces its image cap before touching the filesystem."""
+    tool = NanoBananaTool({"api_key": "test-key"}, _create_mock_coordinator())
+    _use_client(tool, MagicMock())
+
+    result = await tool.execute(
+        {"operation": "analyze_batch", "image_paths": ["x.png"] * 17, "prompt": "Describe"}
+    )
+
+    assert not result.success
+    assert "at most 16" in result.output
+
+
+@pytest.mark.asyncio
+async def test_invalid_input_fails_before_client_setup() -> None:
+    """Test that parameter errors are reported without creating a client."""
+    tool = NanoBananaTool({"api_key": "test-key"}, _create_mock_coordinator())
+    get_client = MagicMock()
+    tool._get_client = get_client  # type: ignore[method-assign]
+
+    result = await tool.execute({"operation": "analyze", "prompt": "test"})
+
+    assert not result.success
+    assert "image_path required" in result.output
+    get_client.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_compare_sends_duplicate_image_once(tmp_path: Path) -> None:
+    """Test that comparing a file with an identical copy sends its bytes only once."""
+    image1_path = tmp_path / "mockup.png"
+    image1_path.write_bytes(b"\x89PNG\r\n\x1a\nsame")
+    image2_path = tmp_path / "mockup-copy.png"
+    image2_path.write_bytes(b"\x89PNG\r\n\x1a\nsame")
+    tool = NanoBananaTool({"api_key": "test-key"}, _create_mock_coordinator())
+    client = MagicMock()
+    client.aio.models.generate_content = AsyncMock(return_value=_text_response("100% match"))
+    _use_client(tool, client)
+
+    result = await tool.execute(
+        {
+            "operation": "compare",
+            "image1_path": str(image1_path),
+            "image2_path": str(image2_path),
+            "prompt": "Match %?",
+            "skip_identical": False,
+        }
+    )
+
+    assert result.success
+    contents = client.aio.models.generate_content.call_args.kwargs["contents"]
+    assert sum(isinstance(item, genai.types.Part) for item in contents) == 1
+
+
+@pytest.mark.asyncio
+async def test_transient_errors_are_retried(tmp_path: Path, monkeypatch: Any) -> None:
+    """Test that 5xx responses are retried with backoff and 4xx client errors are not."""
+    monkeypatch.setattr(tool_module, "_RETRY_BASE_DELAY", 0)
+    image_path = tmp_path / "mockup.png"
+    image_path.write_bytes(b"\x89PNG\r\n\x1a\n")
+    tool = NanoBananaTool(
+        {"api_key": "test-key", "response_cache_size": 0}, _create_mock_coordinator()
+    )
+    unavailable = genai.errors.ServerError(
+        503, {"error": {"code": 503, "message": "Overloaded", "status": "UNAVAILABLE"}}
+    )
+    client = MagicMock()
+    client.aio.models.generate_content = AsyncMock(
+        side_effect=[unavailable, unavailable, _text_response("A login form")]
+    )
+    _use_client(tool, client)
+    analyze = {"operation": "analyze", "image_path": str(image_path), "prompt": "List"}
+
+    result = await tool.execute(analyze)
+
+    assert result.output == {"analysis": "A login form"}
+    assert client.aio.models.generate_content.await_count == 3
+
+    client.aio.models.generate_content = AsyncMock(side_effect=_candidate_count_error())
+    result = await tool.execute(analyze)
+
+    assert not result.success
+    client.aio.models.generate_content.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_compare_identical_images_skips_model_call(tmp_path: Path) -> None:
+    """Test that byte-identical images are reported as a match without a model call."""
+    image1_path = tmp_path / "before.png"
+    image1_path.write_bytes(b"\x89PNG\r\n\x1a\nunchanged")
+    image2_path = tmp_path / "after.png"
+    image2_path.write_bytes(b"\x89PNG\r\n\x1a\nunchanged")
+    tool = NanoBananaTool(
+        {"api_key": "test-key", "response_cache_size": 0}, _create_mock_coordinator()
+    )
+    client = MagicMock()
+    client.aio.models.generate_content = AsyncMock()
+    _use_client(tool, client)
+
+    result = await tool.execute(
+        {
+            "operation": "compare",
+            "image1_path": str(image1_path),
+            "image2_path": str(image2_path),
+            "prompt": "Match %?",
+        }
+    )
+
+    assert result.success
+    assert "100% match" in result.output["comparison"]
+    client.aio.models.generate_content.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_oversized_image_is_rejected_before_reading(tmp_path: Path, monkeypatch: Any) -> None:
+    """Test that images above the size limit fail without a model call."""
+    monkeypatch.setattr(tool_module, "_MAX_IMAGE_BYTES", 8)
+    image_path = tmp_path / "huge.png"
+    image_path.write_bytes(b"\x89PNG\r\n\x1a\n" + b"\x00" * 8)
+    tool = NanoBananaTool({"api_key": "test-key"}, _create_mock_coordinator())
+    client = MagicMock()
+    client.aio.models.generate_content = AsyncMock()
+    _use_client(tool, client)
+
+    result = await tool.execute(
+        {"operation": "analyze", "image_path": str(image_path), "prompt": "test"}
+    )
+
+    assert not result.success
+    assert "Image too large" in result.output
+    client.aio.models.generate_content.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_malformed_parameters_are_rejected() -> None:
+    """Test that wrongly typed parameters return an error instead of raising."""
+    tool = NanoBananaTool({"api_key": "test-key"}, _create_mock_coordinator())
+    _use_client(tool, MagicMock())
+
+    for input_data in [
+        {"operation": "generate", "output_path": "out.png", "number_of_images": "2"},
+        {"operation": "generate", "output_path": "out.png", "number_of_images": True},
+        {"operation": "analyze_batch", "image_paths": 5},
+        {"operation": "analyze_batch", "image_paths": "abc.png"},
+        {"operation": "analyze_batch", "image_paths": ["a.png", 3]},
+        {"operation": "analyze", "image_path": 42},
+    ]:
+        result = await tool.execute({**input_data, "prompt": "test"})
+
+        assert not result.success, input_data